@@ -1,46 +1,97 @@
 from fastapi import FastAPI, APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
 import os
+import re
+import asyncio
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict, EmailStr
-from typing import List, Optional
+from typing import Dict, List, Optional, Union
 import uuid
+import hashlib
+from collections import defaultdict
+from operator import itemgetter
 from datetime import datetime, timezone, timedelta
-from passlib.context import CryptContext
-from jose import JWTError, jwt
+from cachetools import TTLCache
+import bcrypt
+import jwt
+from jwt.utils import base64url_encode
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncIOMotorClient(
+    mongo_url,
+    tz_aware=True,
+    maxPoolSize=50,
+    minPoolSize=10,
+    serverSelectionTimeoutMS=2000,
+    waitQueueTimeoutMS=1000,
+)
 db = client[os.environ['DB_NAME']]
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 api_router = APIRouter(prefix="/api")
 
 SECRET_KEY = os.environ.get('SECRET_KEY', 'your-secret-key-change-in-production')
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Prepared once so decode skips per-call HMAC key preparation
+_JWT_KEY = jwt.PyJWK({
+    "kty": "oct",
+    "k": base64url_encode(SECRET_KEY.encode()).decode(),
+    "alg": ALGORITHM
+})
+
+TOKEN_CACHE_TTL_SECONDS = 30
+
+# sha256(token) -> (user, exp); skips jwt.decode and the users lookup on repeat requests
+_token_cache = TTLCache(maxsize=10000, ttl=TOKEN_CACHE_TTL_SECONDS)
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 
+BCRYPT_ROUNDS = 12
+
+# bcrypt is CPU-bound (~100ms); async handlers call these via asyncio.to_thread
 def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
+    if isinstance(hashed_password, str):
+        hashed_password = hashed_password.encode()
+    return bcrypt.checkpw(plain_password.encode(), hashed_password)
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds=BCRYPT_ROUNDS)).decode()
+
+# Default seed credentials, and the dummy hash unknown emails are verified against so
+# failed logins cost the same either way. Supplied pre-hashed via env (the dummy at
+# BCRYPT_ROUNDS), otherwise hashed once per process by init_password_hashes() at startup.
+ADMIN_PASSWORD_HASH = os.environ.get('ADMIN_PASSWORD_HASH')
+CASHIER_PASSWORD_HASH = os.environ.get('CASHIER_PASSWORD_HASH')
+DUMMY_PASSWORD_HASH = os.environ.get('DUMMY_PASSWORD_HASH')
+
+async def _hash_unless_supplied(supplied, password):
+    return supplied or await asyncio.to_thread(get_password_hash, password)
+
+async def init_password_hashes():
+    global ADMIN_PASSWORD_HASH, CASHIER_PASSWORD_HASH, DUMMY_PASSWORD_HASH
+    ADMIN_PASSWORD_HASH, CASHIER_PASSWORD_HASH, DUMMY_PASSWORD_HASH = await asyncio.gather(
+        _hash_unless_supplied(ADMIN_PASSWORD_HASH, "admin123"),
+        _hash_unless_supplied(CASHIER_PASSWORD_HASH, "cashier123"),
+        _hash_unless_supplied(DUMMY_PASSWORD_HASH, str(uuid.uuid4()))
+    )
 
 def create_access_token(data: dict):
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, _JWT_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 async def get_current_user(token: str = Depends(oauth2_scheme)):
@@ -49,18 +100,25 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+    cache_key = hashlib.sha256(token.encode()).hexdigest()
+    cached = _token_cache.get(cache_key)
+    if cached is not None:
+        user, exp = cached
+        if exp > datetime.now(timezone.utc).timestamp():
+            return dict(user)
+        _token_cache.pop(cache_key, None)
+
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-    except JWTError:
+        payload = jwt.decode(token, _JWT_KEY, algorithms=[ALGORITHM], options={"require": ["exp", "sub"]})
+        user_id: str = payload["sub"]
+    except jwt.InvalidTokenError:
         raise credentials_exception
     
-    user = await db.users.find_one({"id": user_id}, {"_id": 0})
+    user = await db.users.find_one({"id": user_id}, USER_PROJECTION)
     if user is None:
         raise credentials_exception
-    return user
+    _token_cache[cache_key] = (user, payload["exp"])
+    return dict(user)
 
 async def get_admin_user(current_user: dict = Depends(get_current_user)):
     if current_user.get("role") != "admin":
@@ -157,90 +215,105 @@ class ReportSummary(BaseModel):
     sales_by_category: dict
     daily_sales: List[dict]
 
+def name_search_keys(name: str) -> List[str]:
+    """Lowercased name from the start of each word, e.g. "Iced Coffee" -> ["iced coffee", "coffee"]"""
+    lowered = name.lower()
+    return [lowered[match.start():] for match in re.finditer(r"\b\w", lowered)]
+
+# Fetch only the fields each response model serializes
+USER_PROJECTION = {"_id": 0, **{field: 1 for field in User.model_fields}}
+PRODUCT_PROJECTION = {"_id": 0, **{field: 1 for field in Product.model_fields}}
+SALE_PROJECTION = {"_id": 0, **{field: 1 for field in Sale.model_fields}}
+
 @api_router.post("/auth/register", response_model=User)
 async def register(user_data: UserCreate):
-    existing_user = await db.users.find_one({"email": user_data.email}, {"_id": 0})
-    if existing_user:
-        raise HTTPException(status_code=400, detail="Email already registered")
-    
-    hashed_password = get_password_hash(user_data.password)
-    user_dict = user_data.model_dump()
-    user_dict.pop("password")
-    user_obj = User(**user_dict)
-    
-    doc = user_obj.model_dump()
-    doc["password"] = hashed_password
-    doc["created_at"] = doc["created_at"].isoformat()
+    hashed_password = await asyncio.to_thread(get_password_hash, user_data.password)
+    doc = {
+        **user_data.model_dump(exclude={"password"}),
+        "id": str(uuid.uuid4()),
+        "created_at": datetime.now(timezone.utc),
+        "password": hashed_password
+    }
+    user_obj = User.model_construct(**doc)
     
-    await db.users.insert_one(doc)
+    try:
+        await db.users.insert_one(doc)
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Email already registered")
     return user_obj
 
 @api_router.post("/auth/login", response_model=Token)
 async def login(credentials: UserLogin):
+    login_exception = HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Incorrect email or password"
+    )
     user = await db.users.find_one({"email": credentials.email}, {"_id": 0})
-    if not user or not verify_password(credentials.password, user["password"]):
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Incorrect email or password"
-        )
+    if not user:
+        await asyncio.to_thread(verify_password, credentials.password, DUMMY_PASSWORD_HASH)
+        raise login_exception
+    if not await asyncio.to_thread(verify_password, credentials.password, user["password"]):
+        raise login_exception
     
     access_token = create_access_token(data={"sub": user["id"]})
     user.pop("password")
-    if isinstance(user["created_at"], str):
-        user["created_at"] = datetime.fromisoformat(user["created_at"])
     
-    return Token(access_token=access_token, token_type="bearer", user=User(**user))
+    return Token(access_token=access_token, token_type="bearer", user=User.model_construct(**user))
 
 @api_router.get("/auth/me", response_model=User)
 async def get_me(current_user: dict = Depends(get_current_user)):
-    if isinstance(current_user["created_at"], str):
-        current_user["created_at"] = datetime.fromisoformat(current_user["created_at"])
-    return User(**current_user)
+    return User.model_construct(**current_user)
 
 @api_router.get("/products", response_model=List[Product])
-async def get_products(category: Optional[str] = None, search: Optional[str] = None):
+async def get_products(
+    category: Optional[str] = None,
+    search: Optional[str] = None,
+    search_mode: str = "text"
+):
     query = {}
     if category:
         query["category"] = category
     if search:
-        query["name"] = {"$regex": search, "$options": "i"}
+        if search_mode == "prefix":
+            # Partial words for type-ahead: an anchored, case-sensitive regex on the indexed
+            # name_keys is a range scan matching the start of any word in the name
+            query["name_keys"] = {"$regex": "^" + re.escape(search.lower())}
+        else:
+            query["$text"] = {"$search": search}
     
-    products = await db.products.find(query, {"_id": 0}).to_list(1000)
-    for p in products:
-        if isinstance(p["created_at"], str):
-            p["created_at"] = datetime.fromisoformat(p["created_at"])
-    return products
+    return await db.products.find(query, PRODUCT_PROJECTION).to_list(1000)
 
 @api_router.get("/products/top", response_model=List[Product])
 async def get_top_products(limit: int = 9):
-    products = await db.products.find({}, {"_id": 0}).sort("times_sold", -1).limit(limit).to_list(limit)
-    for p in products:
-        if isinstance(p["created_at"], str):
-            p["created_at"] = datetime.fromisoformat(p["created_at"])
-    return products
+    return await db.products.find({}, PRODUCT_PROJECTION).sort("times_sold", -1).limit(limit).to_list(limit)
 
 @api_router.post("/products", response_model=Product)
 async def create_product(product: ProductCreate, current_user: dict = Depends(get_admin_user)):
-    product_obj = Product(**product.model_dump())
-    doc = product_obj.model_dump()
-    doc["created_at"] = doc["created_at"].isoformat()
+    doc = {
+        **product.model_dump(),
+        "id": str(uuid.uuid4()),
+        "name_keys": name_search_keys(product.name),
+        "times_sold": 0,
+        "created_at": datetime.now(timezone.utc)
+    }
+    product_obj = Product.model_construct(**doc)
     await db.products.insert_one(doc)
     return product_obj
 
 @api_router.put("/products/{product_id}", response_model=Product)
 async def update_product(product_id: str, product: ProductUpdate, current_user: dict = Depends(get_admin_user)):
-    existing = await db.products.find_one({"id": product_id}, {"_id": 0})
+    existing = await db.products.find_one({"id": product_id}, {"_id": 1})
     if not existing:
         raise HTTPException(status_code=404, detail="Product not found")
     
     update_data = {k: v for k, v in product.model_dump().items() if v is not None}
+    if "name" in update_data:
+        update_data["name_keys"] = name_search_keys(update_data["name"])
     if update_data:
         await db.products.update_one({"id": product_id}, {"$set": update_data})
     
-    updated = await db.products.find_one({"id": product_id}, {"_id": 0})
-    if isinstance(updated["created_at"], str):
-        updated["created_at"] = datetime.fromisoformat(updated["created_at"])
-    return Product(**updated)
+    updated = await db.products.find_one({"id": product_id}, PRODUCT_PROJECTION)
+    return Product.model_construct(**updated)
 
 @api_router.delete("/products/{product_id}")
 async def delete_product(product_id: str, current_user: dict = Depends(get_admin_user)):
@@ -251,28 +324,28 @@ async def delete_product(product_id: str, current_user: dict = Depends(get_admin
 
 @api_router.post("/sales", response_model=Sale)
 async def create_sale(sale_data: SaleCreate, current_user: dict = Depends(get_current_user)):
-    sale_obj = Sale(
+    doc = {
         **sale_data.model_dump(),
-        cashier_id=current_user["id"],
-        cashier_name=current_user["name"]
-    )
-    
-    doc = sale_obj.model_dump()
-    doc["date"] = doc["date"].isoformat()
-    await db.sales.insert_one(doc)
-    
-    for item in sale_data.products:
-        await db.products.update_one(
-            {"id": item.product_id},
-            {"$inc": {"times_sold": item.quantity}}
-        )
+        "id": str(uuid.uuid4()),
+        "cashier_id": current_user["id"],
+        "cashier_name": current_user["name"],
+        "date": datetime.now(timezone.utc)
+    }
+    sale_obj = Sale.model_construct(**{**doc, "products": sale_data.products})
+    writes = [db.sales.insert_one(doc)]
+    if sale_data.products:
+        writes.append(db.products.bulk_write([
+            UpdateOne({"id": item.product_id}, {"$inc": {"times_sold": item.quantity}})
+            for item in sale_data.products
+        ], ordered=False))
+    await asyncio.gather(*writes)
     
     return sale_obj
 
 @api_router.get("/sales", response_model=List[Sale])
 async def get_sales(
-    start_date: Optional[str] = None,
-    end_date: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
     current_user: dict = Depends(get_current_user)
 ):
     query = {}
@@ -283,92 +356,116 @@ async def get_sales(
             query["date"] = {}
         query["date"]["$lte"] = end_date
     
-    sales = await db.sales.find(query, {"_id": 0}).sort("date", -1).to_list(1000)
-    for s in sales:
-        if isinstance(s["date"], str):
-            s["date"] = datetime.fromisoformat(s["date"])
-    return sales
+    return await db.sales.find(query, SALE_PROJECTION).sort("date", -1).to_list(1000)
 
-@api_router.get("/reports/summary", response_model=ReportSummary)
-async def get_report_summary(
-    period: str = "daily",
-    start_date: Optional[str] = None,
-    end_date: Optional[str] = None,
-    current_user: dict = Depends(get_current_user)
-):
-    query = {}
-    now = datetime.now(timezone.utc)
-    
-    if not start_date:
-        if period == "daily":
-            start_date = now.replace(hour=0, minute=0, second=0, microsecond=0).isoformat()
-        elif period == "weekly":
-            start_date = (now - timedelta(days=7)).isoformat()
-        elif period == "monthly":
-            start_date = (now - timedelta(days=30)).isoformat()
-        elif period == "yearly":
-            start_date = (now - timedelta(days=365)).isoformat()
-    
-    if start_date:
-        query["date"] = {"$gte": start_date}
-    if end_date:
-        if "date" not in query:
-            query["date"] = {}
-        query["date"]["$lte"] = end_date
-    
-    sales = await db.sales.find(query, {"_id": 0}).to_list(10000)
-    
-    total_sales = sum(s["total"] for s in sales)
-    total_transactions = len(sales)
-    
-    product_sales = {}
-    category_sales = {}
-    daily_totals = {}
+# Accepted `period` values; "all" has no start date
+REPORT_PERIODS = ("daily", "weekly", "monthly", "yearly", "all")
+
+def _report_period_start(period: str, now: datetime) -> Optional[datetime]:
+    if period == "daily":
+        return now.replace(hour=0, minute=0, second=0, microsecond=0)
+    elif period == "weekly":
+        return now - timedelta(days=7)
+    elif period == "monthly":
+        return now - timedelta(days=30)
+    elif period == "yearly":
+        return now - timedelta(days=365)
+    return None
+
+def _report_facets() -> dict:
+    """$facet sub-pipelines computing one report from the already-matched sales"""
+    return {
+        "totals": [
+            {"$group": {"_id": None, "total": {"$sum": "$total"}, "count": {"$sum": 1}}}
+        ],
+        "daily": [
+            {"$group": {"_id": {"$dateToString": {"format": "%Y-%m-%d", "date": "$date"}}, "total": {"$sum": "$total"}}},
+            {"$sort": {"_id": 1}}
+        ],
+        "products": [
+            {"$unwind": "$products"},
+            {"$group": {
+                "_id": "$products.product_id",
+                "product_name": {"$first": "$products.product_name"},
+                "quantity": {"$sum": "$products.quantity"},
+                "revenue": {"$sum": "$products.subtotal"}
+            }},
+            {"$lookup": {"from": "products", "localField": "_id", "foreignField": "id", "as": "product"}},
+            {"$project": {
+                "_id": 0,
+                "product_id": "$_id",
+                "product_name": 1,
+                "quantity": 1,
+                "revenue": 1,
+                "category": {"$arrayElemAt": ["$product.category", 0]}
+            }}
+        ]
+    }
+
+async def _report_summary(date_range: dict) -> ReportSummary:
+    # $facet sub-pipelines cannot use indexes, so the date filter stays in the leading $match
+    pipeline = [
+        {"$match": {"date": date_range} if date_range else {}},
+        {"$facet": _report_facets()}
+    ]
+    result = (await db.sales.aggregate(pipeline).to_list(1))[0]
     
-    for sale in sales:
-        sale_date = sale["date"]
-        if isinstance(sale_date, str):
-            sale_date = datetime.fromisoformat(sale_date)
-        day_key = sale_date.strftime("%Y-%m-%d")
-        daily_totals[day_key] = daily_totals.get(day_key, 0) + sale["total"]
-        
-        for item in sale["products"]:
-            pid = item["product_id"]
-            if pid not in product_sales:
-                product_sales[pid] = {
-                    "product_id": pid,
-                    "product_name": item["product_name"],
-                    "quantity": 0,
-                    "revenue": 0
-                }
-            product_sales[pid]["quantity"] += item["quantity"]
-            product_sales[pid]["revenue"] += item["subtotal"]
+    totals_rows = result["totals"]
+    totals = totals_rows[0] if totals_rows else {"total": 0, "count": 0}
     
-    for pid, data in product_sales.items():
-        product = await db.products.find_one({"id": pid}, {"_id": 0})
-        if product:
-            category = product["category"]
-            category_sales[category] = category_sales.get(category, 0) + data["revenue"]
+    category_sales = defaultdict(float)
+    for row in result["products"]:
+        category = row.pop("category", None)
+        if category:
+            category_sales[category] += row["revenue"]
     
-    top_products = sorted(product_sales.values(), key=lambda x: x["quantity"], reverse=True)[:10]
+    top_products = sorted(result["products"], key=itemgetter("quantity"), reverse=True)[:10]
     
-    daily_sales_list = [{"date": k, "total": v} for k, v in sorted(daily_totals.items())]
+    daily_sales_list = [{"date": d["_id"], "total": d["total"]} for d in result["daily"]]
     
     return ReportSummary(
-        total_sales=total_sales,
-        total_transactions=total_transactions,
+        total_sales=totals["total"],
+        total_transactions=totals["count"],
         top_products=top_products,
         sales_by_category=category_sales,
         daily_sales=daily_sales_list
     )
 
+@api_router.get("/reports/summary", response_model=Union[ReportSummary, Dict[str, ReportSummary]])
+async def get_report_summary(
+    period: str = "daily",
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """One report, or a {period: report} dict when `period` is a comma-separated list"""
+    periods = list(dict.fromkeys(p.strip() for p in period.split(",") if p.strip()))
+    if not periods or any(p not in REPORT_PERIODS for p in periods):
+        raise HTTPException(
+            status_code=422,
+            detail=f"Invalid report period {period!r}; expected a comma-separated list of {', '.join(REPORT_PERIODS)}"
+        )
+    now = datetime.now(timezone.utc)
+    
+    date_ranges = []
+    for p in periods:
+        date_range = {}
+        p_start = start_date or _report_period_start(p, now)
+        if p_start:
+            date_range["$gte"] = p_start
+        if end_date:
+            date_range["$lte"] = end_date
+        date_ranges.append(date_range)
+    
+    # One index-bounded pipeline per period, run concurrently
+    reports = await asyncio.gather(*(_report_summary(date_range) for date_range in date_ranges))
+    if "," not in period:
+        return reports[0]
+    return dict(zip(periods, reports))
+
 @api_router.get("/users", response_model=List[User])
 async def get_users(current_user: dict = Depends(get_admin_user)):
-    users = await db.users.find({}, {"_id": 0, "password": 0}).to_list(1000)
-    for u in users:
-        if isinstance(u["created_at"], str):
-            u["created_at"] = datetime.fromisoformat(u["created_at"])
-    return users
+    return await db.users.find({}, USER_PROJECTION).to_list(1000)
 
 @api_router.post("/seed", response_model=dict)
 async def seed_data():
@@ -445,63 +542,29 @@ async def seed_data():
         {"name": "Topping Oreo", "cost": 0.50, "sale_price": 1.25, "employee_price": 1.00, "image_url": "https://images.unsplash.com/photo-1606313564200-e75d5e30476c?w=400"},
     ]
     
-    products_to_insert = []
-    
-    for drink in cold_drinks:
-        product = Product(
-            name=drink["name"],
-            category="cold_drinks",
-            cost=drink["cost"],
-            sale_price=drink["sale_price"],
-            employee_price=drink.get("employee_price", 0),
-            image_url=drink["image_url"],
-            times_sold=0
-        )
-        doc = product.model_dump()
-        doc["created_at"] = doc["created_at"].isoformat()
-        products_to_insert.append(doc)
-    
-    for drink in hot_drinks:
-        product = Product(
-            name=drink["name"],
-            category="hot_drinks",
-            cost=drink["cost"],
-            sale_price=drink["sale_price"],
-            employee_price=drink.get("employee_price", 0),
-            image_url=drink["image_url"],
-            times_sold=0
-        )
-        doc = product.model_dump()
-        doc["created_at"] = doc["created_at"].isoformat()
-        products_to_insert.append(doc)
-    
-    for snack in snacks:
-        product = Product(
-            name=snack["name"],
-            category="snacks",
-            cost=snack["cost"],
-            sale_price=snack["sale_price"],
-            employee_price=snack.get("employee_price", 0),
-            image_url=snack["image_url"],
-            times_sold=0
-        )
-        doc = product.model_dump()
-        doc["created_at"] = doc["created_at"].isoformat()
-        products_to_insert.append(doc)
-    
-    for extra in extras:
-        product = Product(
-            name=extra["name"],
-            category="extras",
-            cost=extra["cost"],
-            sale_price=extra["sale_price"],
-            employee_price=extra.get("employee_price", 0),
-            image_url=extra["image_url"],
-            times_sold=0
-        )
-        doc = product.model_dump()
-        doc["created_at"] = doc["created_at"].isoformat()
-        products_to_insert.append(doc)
+    categories = [
+        ("cold_drinks", cold_drinks),
+        ("hot_drinks", hot_drinks),
+        ("snacks", snacks),
+        ("extras", extras),
+    ]
+    now = datetime.now(timezone.utc)
+    products_to_insert = [
+        {
+            "id": str(uuid.uuid4()),
+            "name": item["name"],
+            "name_keys": name_search_keys(item["name"]),
+            "category": category,
+            "cost": item["cost"],
+            "sale_price": item["sale_price"],
+            "employee_price": item.get("employee_price", 0),
+            "image_url": item["image_url"],
+            "times_sold": 0,
+            "created_at": now
+        }
+        for category, items in categories
+        for item in items
+    ]
     
     if products_to_insert:
         await db.products.insert_many(products_to_insert)
@@ -509,27 +572,31 @@ async def seed_data():
     admin_user = User(
         email="admin@pos.com",
         name="Admin User",
-        role="admin"
+        role="admin",
+        created_at=now
     )
     admin_doc = admin_user.model_dump()
-    admin_doc["password"] = get_password_hash("admin123")
-    admin_doc["created_at"] = admin_doc["created_at"].isoformat()
-    await db.users.insert_one(admin_doc)
+    admin_doc["password"] = ADMIN_PASSWORD_HASH
     
     cashier_user = User(
         email="cashier@pos.com",
         name="Cashier User",
-        role="cashier"
+        role="cashier",
+        created_at=now
     )
     cashier_doc = cashier_user.model_dump()
-    cashier_doc["password"] = get_password_hash("cashier123")
-    cashier_doc["created_at"] = cashier_doc["created_at"].isoformat()
-    await db.users.insert_one(cashier_doc)
+    cashier_doc["password"] = CASHIER_PASSWORD_HASH
+    
+    # Upserts: products can be emptied while the seed users (unique email) remain
+    users_result = await db.users.bulk_write([
+        UpdateOne({"email": doc["email"]}, {"$setOnInsert": doc}, upsert=True)
+        for doc in (admin_doc, cashier_doc)
+    ], ordered=False)
     
     return {
         "message": "Database seeded successfully",
         "products_count": len(products_to_insert),
-        "users_created": 2
+        "users_created": users_result.upserted_count
     }
 
 app.include_router(api_router)
@@ -548,6 +615,55 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Fields older versions stored as ISO strings; BSON date range queries never match those
+STRING_DATE_FIELDS = [("sales", "date"), ("users", "created_at"), ("products", "created_at")]
+
+async def migrate_string_dates():
+    """Convert leftover ISO-string dates to BSON dates; idempotent, a no-op once done"""
+    for collection_name, field in STRING_DATE_FIELDS:
+        collection = db[collection_name]
+        updates = []
+        converted = 0
+        async for doc in collection.find({field: {"$type": "string"}}, {field: 1}):
+            updates.append(UpdateOne(
+                {"_id": doc["_id"]},
+                {"$set": {field: datetime.fromisoformat(doc[field])}}
+            ))
+            if len(updates) == 1000:
+                await collection.bulk_write(updates, ordered=False)
+                converted += len(updates)
+                updates = []
+        if updates:
+            await collection.bulk_write(updates, ordered=False)
+            converted += len(updates)
+        if converted:
+            logger.info(f"Converted {converted} string {collection_name}.{field} values to dates")
+
+async def backfill_name_keys():
+    """Add name_keys to products created before prefix search used them"""
+    updates = [
+        UpdateOne({"_id": doc["_id"]}, {"$set": {"name_keys": name_search_keys(doc["name"])}})
+        async for doc in db.products.find({"name_keys": {"$exists": False}}, {"name": 1})
+    ]
+    if updates:
+        await db.products.bulk_write(updates, ordered=False)
+        logger.info(f"Added name_keys to {len(updates)} products")
+
+@app.on_event("startup")
+async def startup_db_client():
+    await client.admin.command("ping")
+    await init_password_hashes()
+    await migrate_string_dates()
+    await backfill_name_keys()
+    await db.users.create_index("email", unique=True)
+    await db.users.create_index("id", unique=True)
+    await db.products.create_index("id", unique=True)
+    await db.products.create_index("category")
+    await db.products.create_index([("times_sold", -1)])
+    await db.products.create_index([("name", "text")])
+    await db.products.create_index("name_keys")
+    await db.sales.create_index([("date", -1)])
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
     client.close()
\ No newline at end of file
@@ -50,7 +50,7 @@ export default function AdminProductsPage() {
 
   const fetchProducts = async () => {
     try {
-      const params = searchTerm ? { search: searchTerm } : {};
+      const params = searchTerm ? { search: searchTerm, search_mode: "prefix" } : {};
       const response = await axios.get(`${API}/products`, {
         headers: getAuthHeader(),
         params
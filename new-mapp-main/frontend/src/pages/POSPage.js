@@ -56,7 +56,10 @@ export default function POSPage() {
     try {
       const params = {};
       if (selectedCategory) params.category = selectedCategory;
-      if (searchTerm) params.search = searchTerm;
+      if (searchTerm) {
+        params.search = searchTerm;
+        params.search_mode = "prefix";
+      }
       
       const response = await axios.get(`${API}/products`, {
         headers: getAuthHeader(),